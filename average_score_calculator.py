@@ -1,40 +1,101 @@
-from solver import minimax_entropy, read_word_list
+from solver import (
+    minimax_entropy_idx, allowed_guesses, possible_answers, answer_idx, guess_idx, answer_columns, allowed_indices_for,
+    ALL_ANSWER_INDICES, filter_one, precompute_feedback_patterns, get_pattern_matrix, set_pattern_matrix, set_score_threads
+)
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
 
-# Load word lists only once at module level
-allowed_guesses = read_word_list('allowed_wordle_guesses.txt')
-possible_answers = read_word_list('possible_wordle_answers.txt')
+# Worker-side handle on the parent's shared pattern matrix; kept global so the mapping stays alive
+_shared_patterns = None
+# (first guess, {first feedback: (round 2 candidate indices, second guess)}), see build_opening_book
+_opening_book = None
 
 
-def simulate_game(answer, strategy_func, allowed_guesses, possible_answers):
-    guesses = []
-    feedbacks = []
-    possible = possible_answers[:]
+def build_opening_book(strategy_func, allowed_indices):
+    """
+    Precompute the first two rounds, which only depend on the first guess's feedback (at most 243 outcomes).
+    Returns (first_guess, round2) where round2 maps each first-round feedback to the candidate indices that
+    remain and the guess strategy_func picks for them, so games skip the round-1 filter and round-2 search.
+    """
+    pattern_matrix = get_pattern_matrix()
+    first_guess, _ = strategy_func(ALL_ANSWER_INDICES, np.union1d(allowed_indices, answer_columns))
+    column = pattern_matrix[:, guess_idx[first_guess]]
+    round2 = {}
+    for fb in np.unique(column).tolist():
+        candidate_indices = np.flatnonzero(column == fb)
+        guess_pool_indices = np.union1d(allowed_indices, answer_columns[candidate_indices])
+        second_guess, _ = strategy_func(candidate_indices, guess_pool_indices)
+        round2[fb] = (candidate_indices, second_guess)
+    return first_guess, round2
+
+
+def _attach_shared_patterns(name, shape, opening_book):
+    """Pool initializer: view the parent's pattern matrix through shared memory instead of loading a copy."""
+    global _shared_patterns, _opening_book
+    _opening_book = opening_book
+    _shared_patterns = shared_memory.SharedMemory(name=name)
+    set_pattern_matrix(np.ndarray(shape, dtype=np.uint8, buffer=_shared_patterns.buf))
+    # The pool already runs one game per core, so don't fan scoring out over threads as well
+    set_score_threads(1)
+
+
+def simulate_game(answer, strategy_func, allowed_indices):
+    """
+    Simulate one game against answer and return the number of tries.
+    strategy_func works on pattern matrix indices (e.g. minimax_entropy_idx); candidates are kept as
+    answer row indices and filtered with one column compare per guess. Each round's guess pool is the
+    allowed guesses plus the answers still possible, as with minimax_entropy. When the worker has an
+    opening book, the first two guesses and the round-2 candidates come from it.
+    """
+    pattern_matrix = get_pattern_matrix()
+    answer_row = answer_idx[answer]
+    candidate_indices = ALL_ANSWER_INDICES
+    first_guess, round2 = _opening_book if _opening_book is not None else (None, None)
+    second_guess = None
     for attempt in range(1, 7):
-        guess, _ = strategy_func(possible, allowed_guesses)
-        guesses.append(guess)
+        if attempt == 1 and first_guess is not None:
+            guess = first_guess
+        elif attempt == 2 and second_guess is not None:
+            guess = second_guess
+        else:
+            guess_pool_indices = np.union1d(allowed_indices, answer_columns[candidate_indices])
+            guess, _ = strategy_func(candidate_indices, guess_pool_indices)
         if guess == answer:
             return attempt
-        fb = minimax_entropy.get_feedback(guess, answer) if hasattr(minimax_entropy, 'get_feedback') else None
-        if not fb:
-            # fallback to global get_feedback
-            from solver import get_feedback
-            fb = get_feedback(guess, answer)
-        feedbacks.append(fb)
-        possible = [word for word in possible if get_feedback(guess, word) == fb]
+        g = guess_idx[guess]
+        fb = int(pattern_matrix[answer_row, g])
+        if attempt == 1 and round2 is not None:
+            candidate_indices, second_guess = round2[fb]
+        else:
+            candidate_indices = filter_one(candidate_indices, guess, fb)
     return 7  # If not solved in 6 tries, return 7 as a fail-safe
 
 
 def calculate_average_tries():
     total_tries = 0
     results = []
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(simulate_game, answer, minimax_entropy, allowed_guesses, possible_answers): answer for answer in possible_answers}
-        for idx, future in enumerate(as_completed(futures)):
-            tries = future.result()
-            results.append(tries)
-            if (idx + 1) % 100 == 0:
-                print(f"Simulated {idx + 1} games...")
+    # Build the pattern matrix once and share it with the workers
+    precompute_feedback_patterns()
+    matrix = get_pattern_matrix()
+    allowed_indices = allowed_indices_for(allowed_guesses)
+    print("Precomputing the first two rounds...")
+    opening_book = build_opening_book(minimax_entropy_idx, allowed_indices)
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    try:
+        shared = np.ndarray(matrix.shape, dtype=np.uint8, buffer=shm.buf)
+        shared[:] = matrix
+        del shared
+        with ProcessPoolExecutor(initializer=_attach_shared_patterns, initargs=(shm.name, matrix.shape, opening_book)) as executor:
+            futures = {executor.submit(simulate_game, answer, minimax_entropy_idx, allowed_indices): answer for answer in possible_answers}
+            for idx, future in enumerate(as_completed(futures)):
+                tries = future.result()
+                results.append(tries)
+                if (idx + 1) % 100 == 0:
+                    print(f"Simulated {idx + 1} games...")
+    finally:
+        shm.close()
+        shm.unlink()
     average = sum(results) / len(results)
     print(f"Average number of tries: {average:.4f}")
     # Also write the average to a file
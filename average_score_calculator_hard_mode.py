@@ -1,30 +1,33 @@
-from solver_hard_mode import minimax_entropy_hard_mode, enforce_hard_mode_constraints, get_feedback, allowed_guesses, possible_answers
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from solver_hard_mode import play_wordle_hard_mode, possible_answers
+from solver import precompute_feedback_patterns, load_feedback_patterns, set_score_threads
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-def simulate_game_hard_mode(answer):
-    guesses = []
-    feedbacks = []
-    possible = possible_answers[:]
-    for attempt in range(1, 7):
-        guess, _ = minimax_entropy_hard_mode(possible, allowed_guesses, guesses, feedbacks)
-        guesses.append(guess)
-        if guess == answer:
-            return attempt
-        fb = get_feedback(guess, answer)
-        feedbacks.append(fb)
-        possible = [word for word in possible if get_feedback(guess, word) == fb]
-    return 7  # If not solved in 6 tries, return 7 as a fail-safe
+def _load_shared_patterns():
+    """Pool initializer: memory-map the pattern matrix cache so all workers share one copy in the page cache."""
+    load_feedback_patterns()
+    # The pool already runs one game per core, so don't fan scoring out over threads as well
+    set_score_threads(1)
 
-def calculate_average_tries_hard_mode():
-    total_tries = 0
+def simulate_all(n_procs=None):
+    """
+    Play play_wordle_hard_mode against every possible answer on n_procs worker processes (default: one
+    per core) and return the tries in answer order. Workers map the on-disk pattern matrix instead of
+    each building their own, and every game runs quietly.
+    """
     results = []
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(simulate_game_hard_mode, answer): answer for answer in possible_answers}
-        for idx, future in enumerate(as_completed(futures)):
-            tries = future.result()
+    # Make sure the cache file exists before the workers map it
+    precompute_feedback_patterns()
+    play = partial(play_wordle_hard_mode, verbose=False)
+    with ProcessPoolExecutor(max_workers=n_procs, initializer=_load_shared_patterns) as executor:
+        for idx, tries in enumerate(executor.map(play, possible_answers, chunksize=16)):
             results.append(tries)
             if (idx + 1) % 100 == 0:
                 print(f"Simulated {idx + 1} games...")
+    return results
+
+def calculate_average_tries_hard_mode():
+    results = simulate_all()
     average = sum(results) / len(results)
     print(f"[HARD MODE] Average number of tries: {average:.4f}")
     # Also write the average to a file
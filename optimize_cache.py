@@ -5,8 +5,8 @@ Run this script once to create cache files, then the main script will load them
 
 import pickle
 import os
-from collections import Counter
-from solver import read_word_list, get_feedback
+import numpy as np
+from solver import read_word_list, compute_pattern_matrix, save_feedback_patterns, score_guesses, words_to_array, letter_masks, mask_bits
 
 def create_optimization_cache():
     """Create cache files for faster Wordle solver initialization."""
@@ -15,44 +15,33 @@ def create_optimization_cache():
     allowed_guesses = read_word_list('allowed_wordle_guesses.txt')
     possible_answers = read_word_list('possible_wordle_answers.txt')
     
-    # Combine both lists for valid guesses (removing duplicates)
-    all_valid_guesses = list(set(allowed_guesses + possible_answers))
+    # Combine both lists for valid guesses (removing duplicates), in the same order solver.py indexes them
+    all_valid_guesses = sorted(set(allowed_guesses) | set(possible_answers))
     print(f"Loaded {len(allowed_guesses)} allowed guesses and {len(possible_answers)} possible answers.")
     print(f"Total unique valid guesses: {len(all_valid_guesses)}")
     
     # Cache 1: Precompute all feedback patterns
     print("\n1. Precomputing feedback patterns...")
-    feedback_cache = {}
-    
     total_combinations = len(possible_answers) * len(all_valid_guesses)
-    current = 0
-    
-    for answer in possible_answers:
-        feedback_cache[answer] = {}
-        for guess in all_valid_guesses:
-            feedback_cache[answer][guess] = get_feedback(guess, answer)
-            current += 1
-            if current % 10000 == 0:
-                print(f"Progress: {current}/{total_combinations} ({current/total_combinations*100:.1f}%)")
+    print(f"Computing {total_combinations} answer/guess combinations...")
+    pattern_matrix = compute_pattern_matrix(possible_answers, all_valid_guesses)
     
     # Save feedback cache
-    with open('feedback_patterns_cache.pkl', 'wb') as f:
-        pickle.dump(feedback_cache, f)
+    save_feedback_patterns(pattern_matrix)
     print("✓ Saved feedback patterns cache")
     
     # Cache 2: Precompute letter frequency data for common scenarios
     print("\n2. Precomputing letter frequency data...")
     letter_freq_cache = {}
+    # answer_bits[i, c] is 1 when answer i contains letter c, so summing the first rows counts a pool's letters
+    answer_bits = mask_bits(letter_masks(words_to_array(possible_answers)))
     
     # Cache for different answer pool sizes
     for pool_size in [10, 50, 100, 500, 1000, len(possible_answers)]:
         if pool_size <= len(possible_answers):
             # Sample the first pool_size answers
-            sample_answers = possible_answers[:pool_size]
-            letter_counts = Counter()
-            for word in sample_answers:
-                letter_counts.update(set(word))
-            letter_freq_cache[pool_size] = dict(letter_counts)
+            counts = answer_bits[:pool_size].sum(axis=0)
+            letter_freq_cache[pool_size] = {chr(ord('a') + c): int(counts[c]) for c in np.flatnonzero(counts)}
     
     with open('letter_freq_cache.pkl', 'wb') as f:
         pickle.dump(letter_freq_cache, f)
@@ -64,41 +53,21 @@ def create_optimization_cache():
     
     # For minimax entropy strategy
     print("  Computing best first guess for minimax entropy...")
-    best_score = float('inf')
-    best_guess = None
-    
-    # Use ALL valid guesses for comprehensive search
-    guess_subset = all_valid_guesses
-    
-    for i, guess in enumerate(guess_subset):
-        pattern_counts = {}
-        for answer in possible_answers:
-            pattern = feedback_cache[answer][guess]
-            pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
-        
-        total = sum(pattern_counts.values())
-        expected = sum((count/total) * count for count in pattern_counts.values())
-        
-        if expected < best_score:
-            best_score = expected
-            best_guess = guess
-        
-        if i % 100 == 0:
-            print(f"    Progress: {i}/{len(guess_subset)}")
+    # Use ALL valid guesses for comprehensive search, scored in parallel column blocks
+    scores = score_guesses(np.arange(len(possible_answers)), np.arange(len(all_valid_guesses)), matrix=pattern_matrix)
+    best = int(np.argmin(scores))
+    best_guess = all_valid_guesses[best]
+    best_score = scores[best] / len(possible_answers)
     
     first_guesses['minimax_entropy'] = best_guess
     print(f"  Best first guess for minimax entropy: {best_guess} (expected remaining: {best_score:.1f})")
     
     # For letter frequency strategy
     print("  Computing best first guess for letter frequency...")
-    letter_counts = Counter()
-    for word in possible_answers:
-        letter_counts.update(set(word))
-    
-    def score(word):
-        return sum(letter_counts[c] for c in set(word))
-    
-    best_guess_freq = max(all_valid_guesses, key=score)
+    # Number of answers containing each letter, then each guess scores the counts of its distinct letters
+    letter_counts = answer_bits.sum(axis=0)
+    scores = mask_bits(letter_masks(words_to_array(all_valid_guesses))) @ letter_counts
+    best_guess_freq = all_valid_guesses[int(np.argmax(scores))]
     first_guesses['letter_freq'] = best_guess_freq
     print(f"  Best first guess for letter frequency: {best_guess_freq}")
     
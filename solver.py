@@ -1,114 +1,506 @@
 from collections import Counter
 import pickle
 import os
-from functools import lru_cache
+import hashlib
+import glob
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; the NumPy implementations below are used without it
+    njit = None
 
 # Global variables for caching
 _feedback_cache = {}
-_precomputed_patterns = {}
-_cache_dirty = False  # Track if cache was updated
-_cache_file = 'feedback_patterns_cache.pkl'
+_pattern_matrix = None  # uint8 [answer index, guess index] -> base-3 feedback
+_bucket_sizes = None  # uint16 [guess index, feedback] -> number of answers giving that feedback
+_cache_file = 'feedback_patterns.npz'  # Compressed matrix plus the word lists it was built with
+_score_threads = os.cpu_count() or 1  # Threads used by score_guesses (NumPy releases the GIL in its loops)
 
 # Read and Parse Word Lists
 def read_word_list(file_path):
+    # One read and a C-level whitespace split, which also drops blank lines
     with open(file_path, 'r') as file:
-        words = [line.strip() for line in file if line.strip()]
-    return words
+        return file.read().split()
 
 # Load word lists only once at module level
 allowed_guesses = read_word_list('allowed_wordle_guesses.txt')
 possible_answers = read_word_list('possible_wordle_answers.txt')
 
-# Optimized feedback function with caching
-@lru_cache(maxsize=1000000)  # Cache up to 1M feedback calculations
+# Every word that may be guessed, in a fixed order so pattern matrix columns are stable across runs
+all_valid_guesses = sorted(set(allowed_guesses) | set(possible_answers))
+answer_idx = {word: i for i, word in enumerate(possible_answers)}
+guess_idx = {word: i for i, word in enumerate(all_valid_guesses)}
+answer_columns = np.array([guess_idx[word] for word in possible_answers], dtype=np.intp)  # answer row -> its guess column
+# Candidate rows at the start of every game; read-only so games can share it (filtering always returns a new array)
+ALL_ANSWER_INDICES = np.arange(len(possible_answers), dtype=np.int32)
+ALL_ANSWER_INDICES.flags.writeable = False
+# The answers as ASCII bytes, parallel to possible_answers, for the feedback_bytes fallback loops
+possible_answers_bytes = [word.encode('ascii') for word in possible_answers]
+
+# Uncompressed copy of the matrix for memory-mapping, named after a hash of the word lists it is indexed by,
+# so a matching file can be mapped straight away without opening the .npz to compare the lists
+_word_lists_digest = hashlib.sha1('\n'.join(possible_answers + [''] + all_valid_guesses).encode('ascii')).hexdigest()[:16]
+_mmap_file = f'feedback_patterns_{_word_lists_digest}.npy'
+
+# Feedback function; hot paths read the precomputed pattern matrix instead, so this is not memoized
 def get_feedback(guess, answer):
-    """Optimized feedback function with caching for repeated calculations."""
-    feedback = ['0'] * 5
-    answer_copy = list(answer)
-
-    # First pass: Check for correct letters in correct positions
-    for i in range(5):
-        if guess[i] == answer[i]:
-            feedback[i] = '2'
-            answer_copy[i] = None
-
-    # Second pass: Check for correct letters in wrong positions
-    for i in range(5):
-        if feedback[i] == '0' and guess[i] in answer_copy:
-            feedback[i] = '1'
-            # Use a more efficient way to find and remove the first occurrence
-            for j in range(5):
-                if answer_copy[j] == guess[i]:
-                    answer_copy[j] = None
+    """
+    Compute Wordle feedback for a guess against an answer, packed as a base-3 integer.
+    Each position is one digit (0 = gray, 1 = yellow, 2 = green), first letter most
+    significant, so '20100' is returned as 2*81 + 1*9 = 171 and '22222' as 242.
+    """
+    return feedback_bytes(guess.encode('ascii'), answer.encode('ascii'))
+
+def feedback_bytes(g, a):
+    """get_feedback on words already encoded as ASCII bytes, for loops that encode each word once up front."""
+    # bytes index to ints directly, so letters are compared and counted without ord() or 1-char strings
+    answer_letter_counts = [0] * 123  # indexed by byte value, 'a'..'z' = 97..122
+    for c in a:
+        answer_letter_counts[c] += 1
+
+    # First pass: greens consume their letter from the answer counts
+    for x, y in zip(g, a):
+        if x == y:
+            answer_letter_counts[x] -= 1
+
+    # Second pass: yellows take whatever occurrences are left, left to right
+    fb = 0
+    for x, y in zip(g, a):
+        if x == y:
+            fb = fb * 3 + 2
+        elif answer_letter_counts[x] > 0:
+            answer_letter_counts[x] -= 1
+            fb = fb * 3 + 1
+        else:
+            fb *= 3
+
+    return fb
+
+def validate_feedback(feedback):
+    """Validate that feedback is in correct format (5 digits, each 0, 1, or 2)."""
+    if len(feedback) != 5:
+        return False
+    return all(c in '012' for c in feedback)
+
+def encode_feedback(feedback):
+    """Convert a feedback string like '20100' into its base-3 integer form."""
+    if not validate_feedback(feedback):
+        raise ValueError(f"Invalid feedback {feedback!r}: expected 5 digits, each 0, 1, or 2")
+    fb = 0
+    for c in feedback:
+        fb = fb * 3 + int(c)
+    return fb
+
+def decode_feedback(fb):
+    """Convert a base-3 feedback integer back into its 5-character string form."""
+    digits = []
+    for _ in range(5):
+        fb, digit = divmod(fb, 3)
+        digits.append(str(digit))
+    return ''.join(reversed(digits))
+
+ALL_GREEN = encode_feedback('22222')
+# Per-position digits (0 gray, 1 yellow, 2 green) of every packed feedback, so they are never re-parsed
+FEEDBACK_TRITS = tuple(tuple(int(d) for d in decode_feedback(fb)) for fb in range(ALL_GREEN + 1))
+
+# Encode word lists as letter-index arrays for vectorized feedback computation
+def words_to_array(words):
+    """Encode 5-letter lowercase words as a (len(words), 5) uint8 array of letter indices (a=0 ... z=25)."""
+    letters = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8).reshape(-1, 5)
+    return letters - np.uint8(ord('a'))
+
+if njit is not None:
+    @njit(cache=True)
+    def _feedback_kernel(guess_row, answer_row, counts):
+        """get_feedback on uint8 letter rows; counts holds the answer's letter counts and is consumed."""
+        for p in range(5):
+            if guess_row[p] == answer_row[p]:
+                counts[guess_row[p]] -= 1
+        fb = 0
+        for p in range(5):
+            c = guess_row[p]
+            if c == answer_row[p]:
+                digit = 2
+            elif counts[c] > 0:
+                counts[c] -= 1
+                digit = 1
+            else:
+                digit = 0
+            fb = fb * 3 + digit
+        return fb
+
+    @njit(parallel=True, cache=True)
+    def _pattern_matrix_kernel(A, G, out):
+        """Fill out[i, j] with the feedback of guess row G[j] against answer row A[i], answers spread over cores."""
+        for i in prange(A.shape[0]):
+            answer_counts = np.zeros(26, dtype=np.int8)
+            for p in range(5):
+                answer_counts[A[i, p]] += 1
+            counts = np.empty(26, dtype=np.int8)
+            for j in range(G.shape[0]):
+                counts[:] = answer_counts
+                out[i, j] = _feedback_kernel(G[j], A[i], counts)
+
+    @njit(nogil=True, cache=True)
+    def _score_kernel(matrix, rows, columns):
+        """Sum of squared feedback group sizes per column; walks each candidate row once, so reads stay row-major."""
+        n = columns.shape[0]
+        counts = np.zeros(n * 243, dtype=np.int32)
+        for i in range(rows.shape[0]):
+            row = matrix[rows[i]]
+            for j in range(n):
+                counts[j * 243 + row[columns[j]]] += 1
+        scores = np.zeros(n, dtype=np.int64)
+        for j in range(n):
+            total = 0
+            for f in range(243):
+                c = counts[j * 243 + f]
+                total += c * c
+            scores[j] = total
+        return scores
+
+    @njit(nogil=True, cache=True)
+    def _score_kernel_pruned(matrix, rows, columns):
+        """
+        _score_kernel with early termination: a column's running sum of squares only grows, so it stops as
+        soon as it exceeds the best complete score so far. Pruned columns keep that partial sum, which is
+        still above the final minimum, so the minimum and every column tied with it are exact.
+        """
+        n = columns.shape[0]
+        scores = np.empty(n, dtype=np.int64)
+        counts = np.zeros(243, dtype=np.int32)
+        best = np.iinfo(np.int64).max
+        for j in range(n):
+            g = columns[j]
+            total = 0
+            seen = rows.shape[0]
+            for i in range(rows.shape[0]):
+                # Growing a group of size c to c + 1 adds 2c + 1 to the sum of squares
+                f = matrix[rows[i], g]
+                total += 2 * counts[f] + 1
+                counts[f] += 1
+                if total > best:
+                    seen = i + 1
                     break
+            for i in range(seen):
+                counts[matrix[rows[i], g]] = 0
+            scores[j] = total
+            if total < best:
+                best = total
+        return scores
+
+def letter_masks(letters):
+    """26-bit masks with bit c set when letter c appears in the word, from a words_to_array result."""
+    return np.bitwise_or.reduce(np.uint32(1) << letters.astype(np.uint32), axis=1)
+
+# 5-bit lanes of a packed word: the lowest bit of each lane, and its low 4 bits
+LANE_LOW_BITS = np.uint32(0x00108421)
+_LANE_LOW_NIBBLES = np.uint32(0x00108421 * 15)
+
+def pack_words(letters):
+    """Pack each words_to_array row into a uint32, letter at position i in bits 5*i to 5*i+4."""
+    return (letters.astype(np.uint32) << (np.arange(5, dtype=np.uint32) * 5)).sum(axis=1, dtype=np.uint32)
+
+def zero_lanes(packed):
+    """Bit 4 of lane i is set where lane i of packed is 0, exactly (no borrows cross lanes)."""
+    return ~(((packed & _LANE_LOW_NIBBLES) + _LANE_LOW_NIBBLES) | packed) & (LANE_LOW_BITS << np.uint32(4))
+
+def mask_bits(masks):
+    """Unpack letter_masks results into a (len(masks), 26) 0/1 array; column sums count words containing each letter."""
+    return ((masks[:, None] >> np.arange(26, dtype=np.uint32)) & 1).astype(np.int64)
 
-    return ''.join(feedback)
+def compute_pattern_matrix(answers, guesses, chunk_size=16):
+    """
+    Compute the feedback of every guess against every answer.
+    Returns a (len(answers), len(guesses)) uint8 matrix where entry [a, g] equals get_feedback(guesses[g], answers[a]).
+    Uses the Numba kernel when Numba is installed, otherwise NumPy broadcasting over chunks of chunk_size
+    answers so the intermediate arrays stay cache-sized.
+    """
+    A = words_to_array(answers)
+    G = words_to_array(guesses)
+    if njit is not None:
+        matrix = np.empty((len(answers), len(guesses)), dtype=np.uint8)
+        _pattern_matrix_kernel(A, G, matrix)
+        return matrix
+    n_guesses = len(guesses)
+    matrix = np.empty((len(answers), n_guesses), dtype=np.uint8)
+    # same_letter[p, q, g]: guess g has the same letter at positions p and q
+    same_letter = G.T[:, None, :] == G.T[None, :, :]
+
+    for start in range(0, len(A), chunk_size):
+        chunk = A[start:start + chunk_size]
+        n = len(chunk)
+        answer_counts = np.zeros((n, 26), dtype=np.int8)
+        np.add.at(answer_counts, (np.arange(n)[:, None], chunk), 1)
+        # greens[p] is an (n, n_guesses) mask, kept position-major so each slice is contiguous
+        greens = [chunk[:, p, None] == G[None, :, p] for p in range(5)]
+
+        pattern = np.zeros((n, n_guesses), dtype=np.uint8)
+        yellows = []
+        for p in range(5):
+            # Occurrences of the guess letter at p still unclaimed in the answer:
+            # total count, minus greens on that letter, minus yellows already given to it at earlier positions
+            remaining = answer_counts[:, G[:, p]]
+            for q in range(5):
+                remaining -= greens[q] & same_letter[p, q]
+            for q in range(p):
+                remaining -= yellows[q] & same_letter[p, q]
+            yellow = ~greens[p] & (remaining > 0)
+            yellows.append(yellow)
+            pattern = pattern * 3 + (greens[p].astype(np.uint8) * 2 + yellow)
+        matrix[start:start + n] = pattern
+
+    return matrix
+
+# Letter positions and letter sets of every guessable word, for vectorized per-word checks (e.g. hard mode)
+guess_letters = words_to_array(all_valid_guesses)
+guess_letter_masks = letter_masks(guess_letters)
+guess_words_u32 = pack_words(guess_letters)
 
 # Precompute all feedback patterns for faster lookup
 def precompute_feedback_patterns():
     """Precompute all feedback patterns between possible answers and allowed guesses."""
-    global _precomputed_patterns
-    global _cache_file
-    
+    global _pattern_matrix
+
+    # Already loaded (e.g. by a pool initializer), nothing to do
+    if _pattern_matrix is not None:
+        return
+
     # Try to load from cache file
-    if os.path.exists(_cache_file):
-        try:
-            with open(_cache_file, 'rb') as f:
-                _precomputed_patterns = pickle.load(f)
-            print("Loaded precomputed feedback patterns from cache.")
-            return
-        except:
-            print("Cache file corrupted, recomputing...")
-    
+    if load_feedback_patterns():
+        return
+
     print("Precomputing feedback patterns (this may take a moment)...")
-    
+
     # Precompute patterns for all possible answer-guess combinations
     # Include both allowed_guesses and possible_answers as valid guesses
-    all_valid_guesses = list(set(allowed_guesses + possible_answers))
-    for answer in possible_answers:
-        _precomputed_patterns[answer] = {}
-        for guess in all_valid_guesses:
-            _precomputed_patterns[answer][guess] = get_feedback(guess, answer)
-    
+    _pattern_matrix = compute_pattern_matrix(possible_answers, all_valid_guesses)
+
     # Save to cache file
     try:
-        with open(_cache_file, 'wb') as f:
-            pickle.dump(_precomputed_patterns, f)
+        save_feedback_patterns(_pattern_matrix)
         print("Saved feedback patterns to cache.")
     except:
         print("Warning: Could not save cache file.")
 
+def _cache_matches_word_lists(data):
+    """
+    Whether an opened .npz cache was built with the current answer and guess lists. It is keyed on the same
+    word list digest as the .npy copy; caches written before the digest was stored compare the lists instead.
+    """
+    if 'digest' in data.files:
+        return str(data['digest']) == _word_lists_digest
+    return data['answers'].tolist() == possible_answers and data['guesses'].tolist() == all_valid_guesses
+
+def load_feedback_patterns():
+    """
+    Load the precomputed feedback pattern matrix from the cache files. Returns True on success.
+    The matrix is memory-mapped from the .npy copy keyed on the word lists' hash. If that is missing it is
+    recreated from the compressed .npz cache, whose embedded word lists are checked against the current ones.
+    """
+    global _pattern_matrix
+
+    shape = (len(possible_answers), len(all_valid_guesses))
+    matrix = None
+    if os.path.exists(_mmap_file):
+        try:
+            # Memory-map read-only: pages come from the OS page cache and are shared by every process that maps them
+            matrix = np.load(_mmap_file, mmap_mode='r')
+        except:
+            matrix = None
+        if matrix is not None and (matrix.dtype != np.uint8 or matrix.shape != shape):
+            matrix = None
+    if matrix is None:
+        if not os.path.exists(_cache_file):
+            return False
+        try:
+            with np.load(_cache_file) as data:
+                if not _cache_matches_word_lists(data):
+                    print("Cache file does not match the current word lists, recomputing...")
+                    return False
+                matrix = data['mat']
+        except:
+            print("Cache file corrupted, recomputing...")
+            return False
+        if matrix.dtype != np.uint8 or matrix.shape != shape:
+            print("Cache file does not match the current word lists, recomputing...")
+            return False
+        matrix = _save_mmap_copy(matrix)
+    _pattern_matrix = matrix
+    print("Loaded precomputed feedback patterns from cache.")
+    return True
+
+def compute_bucket_sizes(matrix, chunk_rows=256):
+    """
+    Count, for every guess column and each of the 243 feedbacks, how many answer rows give that feedback.
+    Returns a (guesses, 243) uint16 table; rows are summed in chunks to keep the bincount keys small.
+    """
+    n_guesses = matrix.shape[1]
+    offsets = np.arange(n_guesses, dtype=np.intp) * 243
+    counts = np.zeros(n_guesses * 243, dtype=np.int64)
+    for start in range(0, matrix.shape[0], chunk_rows):
+        keys = matrix[start:start + chunk_rows] + offsets
+        counts += np.bincount(keys.ravel(), minlength=n_guesses * 243)
+    return counts.reshape(n_guesses, 243).astype(np.uint16)
+
+def get_bucket_sizes():
+    """
+    Feedback bucket sizes of every guess against the full answer list (see compute_bucket_sizes), read from
+    the .npz cache when it was built with the current word lists (the matrix may have come from the .npy copy
+    while the .npz holds other lists), otherwise computed from the loaded pattern matrix. None without a matrix.
+    """
+    global _bucket_sizes
+    if _bucket_sizes is None and _pattern_matrix is not None:
+        try:
+            with np.load(_cache_file) as data:
+                if 'buckets' in data.files and _cache_matches_word_lists(data):
+                    _bucket_sizes = data['buckets']
+        except:
+            pass
+        if _bucket_sizes is None or _bucket_sizes.shape != (_pattern_matrix.shape[1], 243):
+            _bucket_sizes = compute_bucket_sizes(_pattern_matrix)
+    return _bucket_sizes
+
+def get_pattern_matrix():
+    """Return the loaded feedback pattern matrix, or None if it has not been loaded."""
+    return _pattern_matrix
+
+def set_pattern_matrix(matrix):
+    """Use an already-built pattern matrix (e.g. a shared memory view) instead of loading the cache file."""
+    global _pattern_matrix, _bucket_sizes
+    _pattern_matrix = matrix
+    _bucket_sizes = None
+
+def set_score_threads(threads):
+    """Set how many threads score_guesses may use; 1 disables threading."""
+    global _score_threads
+    _score_threads = max(1, threads)
+
+def save_feedback_patterns(matrix):
+    """
+    Write a feedback pattern matrix to the compressed cache file, together with the answer and guess
+    lists that index its rows and columns, plus the uncompressed copy used for memory-mapping.
+    """
+    np.savez_compressed(_cache_file, mat=matrix, answers=np.array(possible_answers), guesses=np.array(all_valid_guesses),
+                        buckets=compute_bucket_sizes(matrix), digest=np.array(_word_lists_digest))
+    _save_mmap_copy(matrix)
+
+def _save_mmap_copy(matrix):
+    """
+    Write the uncompressed .npy copy of the matrix and return it memory-mapped, removing copies left behind
+    by other word lists. It is only an optimization, so if it cannot be written the in-memory matrix is returned instead.
+    """
+    try:
+        # Only the copy for the current word lists is ever mapped; older ones are ~30MB each of dead weight
+        for stale in glob.glob('feedback_patterns_*.npy'):
+            if stale != _mmap_file:
+                os.remove(stale)
+        np.save(_mmap_file, matrix)
+        return np.load(_mmap_file, mmap_mode='r')
+    except OSError as e:
+        print(f"Warning: Could not write {_mmap_file}: {e}")
+        return matrix
+
+def answer_indices(words):
+    """Map answer words to pattern matrix rows. Returns None if the matrix is not loaded or a word has no row."""
+    if _pattern_matrix is None:
+        return None
+    try:
+        return np.array([answer_idx[word] for word in words], dtype=np.intp)
+    except KeyError:
+        return None
+
+def guess_indices(words):
+    """Map guess words to sorted, de-duplicated pattern matrix columns. Returns None if a word has no column."""
+    try:
+        return np.unique(np.array([guess_idx[word] for word in words], dtype=np.intp))
+    except KeyError:
+        return None
+
+# Columns of the module-level allowed_guesses list, so callers passing it don't re-index 10k words per call
+_allowed_indices = guess_indices(allowed_guesses)
+
+def allowed_indices_for(words):
+    """guess_indices(words), reusing the precomputed columns when words is the module-level allowed_guesses list."""
+    return _allowed_indices if words is allowed_guesses else guess_indices(words)
+
+def _group_sizes(matrix, candidate_indices, columns):
+    """(len(columns), 243) counts of candidate rows per feedback pattern for each of the given columns."""
+    k = len(columns)
+    block = matrix[np.ix_(candidate_indices, columns)]
+    # Offset each column into its own 243-slot range so one bincount tallies the whole block
+    keys = block + np.arange(k, dtype=np.intp) * 243
+    return np.bincount(keys.ravel(), minlength=243 * k).reshape(k, 243)
+
+def _score_block(matrix, candidate_indices, columns, prune=False):
+    """Sum of squared feedback group sizes for each of the given columns over the candidate rows."""
+    if njit is not None:
+        # nogil, so score_guesses' thread pool still runs blocks in parallel
+        if prune:
+            return _score_kernel_pruned(matrix, candidate_indices, columns)
+        return _score_kernel(matrix, candidate_indices, columns)
+    counts = _group_sizes(matrix, candidate_indices, columns)
+    return (counts * counts).sum(axis=1)
+
+def _sum_c_log_c(counts):
+    """Sum of c*log(c) over group sizes along the last axis; lower means higher entropy for a fixed total."""
+    counts = np.asarray(counts, dtype=np.float64)
+    return (counts * np.log(np.maximum(counts, 1))).sum(axis=-1)
+
+def score_guesses(candidate_indices, guess_pool_indices, matrix=None, chunk_elements=1 << 21, prune=False):
+    """
+    Score every guess column against the candidate answer rows of the pattern matrix.
+    The score is the sum of squared feedback group sizes; divided by the number of candidates it is the
+    expected number of answers left after the guess. Columns are processed in blocks of about chunk_elements
+    matrix entries, spread over a thread pool when there is more than one block.
+    prune: with Numba, stop scoring a guess once it cannot reach the block's best score. Only the minimum
+    and the guesses tied with it are then exact; the other scores are lower bounds above the minimum.
+    """
+    if matrix is None:
+        matrix = _pattern_matrix
+    if matrix is _pattern_matrix and len(candidate_indices) == len(possible_answers):
+        # Every answer is a candidate, so the group sizes are the precomputed bucket sizes
+        sizes = get_bucket_sizes()[guess_pool_indices].astype(np.int64)
+        return (sizes * sizes).sum(axis=1)
+    step = max(1, chunk_elements // len(candidate_indices))
+    blocks = [guess_pool_indices[start:start + step] for start in range(0, len(guess_pool_indices), step)]
+    if len(blocks) > 1 and _score_threads > 1:
+        with ThreadPoolExecutor(max_workers=min(_score_threads, len(blocks))) as executor:
+            scores = list(executor.map(lambda columns: _score_block(matrix, candidate_indices, columns, prune), blocks))
+    else:
+        scores = [_score_block(matrix, candidate_indices, columns, prune) for columns in blocks]
+    return np.concatenate(scores)
+
 # Optimized filter function using precomputed patterns
+def filter_one(candidate_indices, guess, feedback):
+    """Apply a single round's (guess, feedback) to an array of candidate answer rows and return the rows that remain."""
+    g = guess_idx.get(guess)
+    if _pattern_matrix is not None and g is not None:
+        # One vectorized compare over the guess's column replaces the per-word loop
+        mask = _pattern_matrix[candidate_indices, g] == feedback
+    else:
+        # Fallback to original method
+        g = guess.encode('ascii')
+        mask = np.array([feedback_bytes(g, possible_answers_bytes[i]) == feedback for i in candidate_indices], dtype=bool)
+    return candidate_indices[mask]
+
 def filter_possible_answers(guesses, feedbacks):
-    """Optimized filter using precomputed feedback patterns."""
-    global _cache_dirty
-    filtered_answers = possible_answers[:]
-    
+    """Replay a whole guess history from the full answer list. Games in progress should call filter_one per round."""
+    candidate_indices = ALL_ANSWER_INDICES
     for guess, feedback in zip(guesses, feedbacks):
-        if _precomputed_patterns:
-            # Use precomputed patterns if available, but add to cache if missing
-            new_filtered = []
-            for word in filtered_answers:
-                if word not in _precomputed_patterns:
-                    _precomputed_patterns[word] = {}
-                if guess not in _precomputed_patterns[word]:
-                    # Compute and add to cache
-                    _precomputed_patterns[word][guess] = get_feedback(guess, word)
-                    _cache_dirty = True
-                if _precomputed_patterns[word][guess] == feedback:
-                    new_filtered.append(word)
-            filtered_answers = new_filtered
-        else:
-            # Fallback to original method
-            filtered_answers = [
-                word for word in filtered_answers 
-                if get_feedback(guess, word) == feedback
-            ]
-    
-    return filtered_answers
+        candidate_indices = filter_one(candidate_indices, guess, feedback)
+    return [possible_answers[i] for i in candidate_indices]
 
 # Guess selection strategies
 _first_guess_cache = None
+_INITIAL_ANSWER_COUNT = len(possible_answers)
+_POSSIBLE_ANSWERS_SET = frozenset(possible_answers)
+# Sorted allowed guesses for the unindexed minimax_entropy pool, built once instead of on every call
+_ALLOWED_GUESSES = allowed_guesses
+_SORTED_ALLOWED_GUESSES = sorted(allowed_guesses)
+_ALLOWED_GUESSES_SET = frozenset(allowed_guesses)
 
 # Try to load precomputed first guess cache
 _first_guess_cache_file = 'first_guesses_cache.pkl'
@@ -120,10 +512,62 @@ if os.path.exists(_first_guess_cache_file):
     except Exception as e:
         print(f"Warning: Could not load first guess cache: {e}")
 
-def minimax_entropy(possible_answers, allowed_guesses):
-    global _cache_dirty
+# With fast_tail, candidate sets up to this size are only searched among the candidates themselves
+_FAST_TAIL_SIZE = 5
+
+def minimax_entropy_idx(candidate_indices, guess_pool_indices, fast_tail=False):
+    """
+    Index-based core of minimax_entropy: candidates are pattern matrix rows, guesses are matrix columns.
+    Returns the best guess word and its expected number of remaining answers.
+    fast_tail: guess the first of 2 candidates outright and only consider candidates as guesses
+    for up to _FAST_TAIL_SIZE of them; much cheaper, but can occasionally cost an extra guess.
+    """
+    # Use precomputed first guess if available and this is the initial state
+    if _first_guess_cache and len(candidate_indices) == len(possible_answers):
+        fg = _first_guess_cache.get('minimax_entropy')
+        if fg in guess_idx and (guess_pool_indices == guess_idx[fg]).any():
+            return fg, None
+    if len(candidate_indices) == 0:
+        raise ValueError("No possible answers found")
+    # If only one possible answer remains, guess it!
+    if len(candidate_indices) == 1:
+        return possible_answers[candidate_indices[0]], float('inf')
+    # Either of two candidates splits the other off, so there is nothing to search
+    if fast_tail and len(candidate_indices) == 2:
+        return possible_answers[candidate_indices[0]], 1.0
+    # If 2 or fewer possible answers (or a small tail with fast_tail), only guess from possible_answers
+    if len(candidate_indices) <= (_FAST_TAIL_SIZE if fast_tail else 2):
+        guess_pool_indices = answer_columns[candidate_indices]
+    # Integer sum of squared group sizes: same argmin as the expected size, without float division
+    # Only the best score and the guesses tied on it are used, so the rest may be pruned
+    scores = score_guesses(candidate_indices, guess_pool_indices, prune=True)
+    min_score = scores.min()
+    best_score = int(min_score) / len(candidate_indices)
+    best_guesses = guess_pool_indices[scores == min_score]
+    # Prefer a guess that is in possible_answers
+    in_candidates = np.isin(best_guesses, answer_columns[candidate_indices])
+    if in_candidates.any():
+        best_guesses = best_guesses[in_candidates]
+    # Break any remaining tie by entropy, computed only for the tied guesses
+    if len(best_guesses) > 1:
+        if len(candidate_indices) == len(possible_answers):
+            counts = get_bucket_sizes()[best_guesses]
+        else:
+            counts = _group_sizes(_pattern_matrix, candidate_indices, best_guesses)
+        best_guesses = best_guesses[[np.argmin(_sum_c_log_c(counts))]]
+    return all_valid_guesses[best_guesses[0]], best_score
+
+def minimax_entropy(possible_answers, allowed_guesses, fast_tail=False):
+    # Work on pattern matrix indices when every word is indexed
+    candidate_indices = answer_indices(possible_answers)
+    if candidate_indices is not None:
+        allowed_indices = allowed_indices_for(allowed_guesses)
+        if allowed_indices is not None:
+            guess_pool_indices = np.union1d(allowed_indices, answer_columns[candidate_indices])
+            return minimax_entropy_idx(candidate_indices, guess_pool_indices, fast_tail)
     # Use precomputed first guess if available and this is the initial state
-    if _first_guess_cache and len(possible_answers) == len(possible_answers) and set(possible_answers) == set(read_word_list('possible_wordle_answers.txt')):
+    # (the set comparison only runs when the length already matches the full answer list)
+    if _first_guess_cache and len(possible_answers) == _INITIAL_ANSWER_COUNT and set(possible_answers) == _POSSIBLE_ANSWERS_SET:
         fg = _first_guess_cache.get('minimax_entropy')
         if fg and (fg in allowed_guesses or fg in possible_answers):
             return fg, None
@@ -133,50 +577,50 @@ def minimax_entropy(possible_answers, allowed_guesses):
     # If only one possible answer remains, guess it!
     if len(possible_answers) == 1:
         return possible_answers[0], float('inf')
-    # If 2 or fewer possible answers, only guess from possible_answers
+    if fast_tail and len(possible_answers) == 2:
+        return possible_answers[0], 1.0
+    # If 2 or fewer possible answers (or a small tail with fast_tail), only guess from possible_answers
     # Otherwise, use both allowed_guesses and possible_answers
-    if len(possible_answers) <= 2:
+    if len(possible_answers) <= (_FAST_TAIL_SIZE if fast_tail else 2):
         guess_pool = possible_answers
     else:
-        # Combine both lists, removing duplicates
-        guess_pool = list(set(allowed_guesses + possible_answers))
-    best_score = float('inf')
-    best_guesses = []
+        # Allowed guesses plus the candidates in sorted order, as on the indexed path, so ties break the same way
+        if allowed_guesses is _ALLOWED_GUESSES:
+            base, base_set = _SORTED_ALLOWED_GUESSES, _ALLOWED_GUESSES_SET
+        else:
+            base, base_set = sorted(set(allowed_guesses)), set(allowed_guesses)
+        extra = [word for word in possible_answers if word not in base_set]
+        # Both runs are sorted, so this is a linear merge
+        guess_pool = sorted(base + sorted(set(extra))) if extra else base
+    best_score = None
+    best_guesses = []  # (guess, pattern counts) for every guess tied on the best score
+    # Encode every word once instead of on every feedback call
+    answers_bytes = [answer.encode('ascii') for answer in possible_answers]
     for guess in guess_pool:
+        g = guess.encode('ascii')
         # Map feedback pattern to count of possible answers
         pattern_counts = {}
-        if _precomputed_patterns:
-            # Use precomputed patterns for much faster lookup, but handle missing entries
-            for answer in possible_answers:
-                if answer not in _precomputed_patterns:
-                    _precomputed_patterns[answer] = {}
-                if guess not in _precomputed_patterns[answer]:
-                    _precomputed_patterns[answer][guess] = get_feedback(guess, answer)
-                    _cache_dirty = True
-                pattern = _precomputed_patterns[answer][guess]
-                pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
-        else:
-            # Fallback to original method
-            for answer in possible_answers:
-                pattern = get_feedback(guess, answer)
-                pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
-        # Calculate expected size (entropy)
-        total = sum(pattern_counts.values())
-        expected = sum((count/total) * count for count in pattern_counts.values())
-        if expected < best_score:
+        for answer in answers_bytes:
+            pattern = feedback_bytes(g, answer)
+            pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
+        # Sum of squared group sizes (integer); divided by the total it is the expected remaining size
+        expected = sum(count * count for count in pattern_counts.values())
+        if best_score is None or expected < best_score:
             best_score = expected
-            best_guesses = [guess]
+            best_guesses = [(guess, pattern_counts)]
         elif expected == best_score:
-            best_guesses.append(guess)
+            best_guesses.append((guess, pattern_counts))
     # If no best guesses found, return first allowed guess
     if not best_guesses:
         return allowed_guesses[0], float('inf')
+    best_score /= len(possible_answers)
     # Prefer a guess that is in possible_answers
-    for guess in best_guesses:
-        if guess in possible_answers:
-            return guess, best_score
-    # Otherwise, return any of the best guesses
-    return best_guesses[0], best_score
+    in_candidates = [entry for entry in best_guesses if entry[0] in possible_answers]
+    if in_candidates:
+        best_guesses = in_candidates
+    # Break any remaining tie by entropy
+    guess, _ = min(best_guesses, key=lambda entry: _sum_c_log_c(list(entry[1].values())))
+    return guess, best_score
 
 # Interactive game loop
 def play_wordle(strategy_func, answer=None):
@@ -185,11 +629,11 @@ def play_wordle(strategy_func, answer=None):
     - strategy_func: function to select the next guess (e.g., letter_freq_heuristic or minimax_entropy)
     - answer: if provided, the game is simulated (auto-feedback); if None, user provides feedback
     """
-    global _cache_dirty, _cache_file, _precomputed_patterns
     while True:
         guesses = []
         feedbacks = []
-        possible = possible_answers[:]  # Start with all possible answers
+        possible = possible_answers  # Start with all possible answers (strategies don't modify the list)
+        candidate_indices = ALL_ANSWER_INDICES
 
         for attempt in range(1, 7):  # Wordle allows up to 6 guesses
             # Select guess
@@ -202,22 +646,28 @@ def play_wordle(strategy_func, answer=None):
 
             # If only one possible answer remains, feedback is always 22222
             if len(possible) == 1:
-                fb = "22222"
-                print(f"Feedback: {fb}")
+                fb = ALL_GREEN
+                print(f"Feedback: {decode_feedback(fb)}")
             else:
                 # Get feedback
                 if answer:
                     fb = get_feedback(guess, answer)
-                    print(f"Feedback: {fb}")
+                    print(f"Feedback: {decode_feedback(fb)}")
                 else:
-                    fb = input("Enter feedback (e.g., 20100 -- 2 for greens, 1 for yellows, 0 for grays/blacks) or 'quit' to exit): ").strip()
-                    if fb.lower() in ['quit', 'exit']:
-                        print("Exiting game loop by user request.")
-                        return
+                    while True:
+                        fb = input("Enter feedback (e.g., 20100 -- 2 for greens, 1 for yellows, 0 for grays/blacks) or 'quit' to exit): ").strip()
+                        if fb.lower() in ['quit', 'exit']:
+                            print("Exiting game loop by user request.")
+                            return
+                        if validate_feedback(fb):
+                            break
+                        print("Invalid feedback! Please enter 5 digits (0, 1, or 2).")
+                    fb = encode_feedback(fb)
             feedbacks.append(fb)
 
             # Debug: print possible answers after feedback
-            possible = filter_possible_answers(guesses, feedbacks)
+            candidate_indices = filter_one(candidate_indices, guess, fb)
+            possible = [possible_answers[i] for i in candidate_indices]
             print(f"{len(possible)} possible answers remain.")
             if len(possible) <= 10:  # Only show all if 10 or fewer
                 print(f"Possible answers: {possible}")
@@ -225,7 +675,7 @@ def play_wordle(strategy_func, answer=None):
                 print(f"First 5 possible answers: {possible[:5]}...")
 
             # Check for win
-            if fb == "22222":
+            if fb == ALL_GREEN:
                 print(f"Solved in {attempt} guesses! The answer was {guess}.")
                 print ("Initiating next game... \n\n")
                 break
@@ -233,16 +683,6 @@ def play_wordle(strategy_func, answer=None):
         else:
             print("Failed to solve the puzzle.")
 
-        # At the end of each game, persist the cache if dirty
-        if _cache_dirty:
-            try:
-                with open(_cache_file, 'wb') as f:
-                    pickle.dump(_precomputed_patterns, f)
-                print("[Cache] Updated feedback patterns cache written to disk.")
-                _cache_dirty = False
-            except Exception as e:
-                print(f"[Cache] Failed to write updated cache: {e}")
-
 # GREEN = 2, YELLOW = 1, GRAY = 0
 if __name__ == "__main__":
     # Precompute feedback patterns for faster execution